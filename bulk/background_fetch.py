@@ -7,6 +7,8 @@ from pathlib import Path
 
 import ujson
 
+from bulk.history import DATE_FORMAT, index_file, write_bulk
+from bulk.hits import PathHits
 from bulk.image_model import AbstractImageModel
 from bulk.site_model import AbstractSiteModel
 
@@ -22,12 +24,17 @@ def create_background_bulk_crawler_task(
     site_model: AbstractSiteModel,
     image_model: AbstractImageModel,
     path: Path,
+    path_hits: PathHits | None = None,
+    path_access_log: Path | None = None,  # nginx access log of `/static_json_gzip/cache/*` requests
+    path_state: Path | None = None,  # private (not published) folder for the crawl checkpoint
     retry_period: datetime.timedelta = datetime.timedelta(
         minutes=10
     ),  # if bulk fails - try again in Xmin  TODO: not currently working
 ) -> t.Callable[..., t.Awaitable[t.NoReturn]]:
     path_gzip_data = path.joinpath(site_model.name + ".json.gz")
     path_gzip_images = path.joinpath(image_model.name + ".json.gz")
+    path_gzip_projection = path.joinpath(site_model.name + "-projection.json.gz")
+    path_checkpoint = path_state.joinpath(site_model.name + ".checkpoint.json") if path_state else None
 
     def get_age(path: Path) -> datetime.timedelta:
         if not path.exists():
@@ -40,17 +47,22 @@ def create_background_bulk_crawler_task(
         if file.exists():
             date_string = datetime.datetime.fromtimestamp(
                 file.stat().st_mtime
-            ).strftime("%Y-%m-%d-%H-%M")
-            file.rename(
-                path.joinpath(
-                    f'{file.name.removesuffix(".json.gz")}-{date_string}.json.gz'
-                )
+            ).strftime(DATE_FORMAT)
+            file_rotated = path.joinpath(
+                f'{file.name.removesuffix(".json.gz")}-{date_string}.json.gz'
             )
+            if index_file(file).exists():
+                index_file(file).rename(index_file(file_rotated))
+            file.rename(file_rotated)
 
     async def _generate_bulk_cache():
+        # Update request frequency - used by the crawl to prioritise paths
+        if path_hits is not None and path_access_log:
+            await asyncio.to_thread(path_hits.read_access_log, path_access_log)
+
         # Generate Data
         try:
-            api_bulk = await site_model.crawl()
+            api_bulk = await site_model.crawl(checkpoint=path_checkpoint)
         except Exception as ex:
             log.exception(ex)
             return
@@ -58,8 +70,12 @@ def create_background_bulk_crawler_task(
             # TODO: Async write?
             log.info(f"BULK_CACHE: writing {path_gzip_data}")
             rotate_output_file(path_gzip_data)
-            with gzip.open(path_gzip_data, "wt", encoding="UTF-8") as zipfile:
-                ujson.dump(api_bulk, zipfile)
+            write_bulk(path_gzip_data, api_bulk)  # with index for `/history`
+            if site_model.projection_report.bytes_fetched:
+                log.info(f"BULK_CACHE: writing {path_gzip_projection}")
+                rotate_output_file(path_gzip_projection)
+                with gzip.open(path_gzip_projection, "wt", encoding="UTF-8") as zipfile:
+                    ujson.dump(site_model.projection_report.asdict(), zipfile)
 
         # Generate Image Previews
         try:
@@ -1,5 +1,6 @@
 import itertools
-from collections.abc import Mapping, Sequence, Generator
+import typing as t
+from collections.abc import Mapping, Sequence, Generator, Iterable
 
 
 def get_path(data: Sequence | Mapping, path: str | Sequence[str]):
@@ -107,3 +108,132 @@ def crawl_for_key(data: Mapping | Sequence, key: str) -> Generator:
         yield from itertools.chain.from_iterable(crawl_for_key(i, key) for i in data)
     #    case _:
     #        pass
+
+
+def _split_path(path: str | Sequence[str]) -> list[str]:
+    return path.split(".") if isinstance(path, str) else list(path)
+
+
+_MISSING = object()
+
+
+def _items(data) -> Iterable[tuple[t.Any, t.Any]] | None:
+    if isinstance(data, Mapping):
+        return data.items()
+    if isinstance(data, Sequence) and not isinstance(data, str):
+        return enumerate(data)
+    return None
+
+
+def _include_paths(data, paths: list[list[str]]):
+    if any(not path for path in paths):  # a path ends here - keep everything below
+        return data
+    items: Iterable[tuple[t.Any, t.Any]] | None = _items(data)
+    if items is None:
+        return _MISSING
+    projected = {}
+    for key, value in items:
+        sub_paths = [path[1:] for path in paths if path[0] in ("*", str(key))]
+        if sub_paths and (value := _include_paths(value, sub_paths)) is not _MISSING:
+            projected[key] = value
+    if not projected:
+        return _MISSING
+    if isinstance(data, Mapping):
+        return projected
+    return [projected.get(index) for index in range(len(data))]
+
+
+def _exclude_paths(data, paths: list[list[str]]):
+    items: Iterable[tuple[t.Any, t.Any]] | None = _items(data)
+    if items is None:
+        return data
+    projected = {}
+    for key, value in items:
+        sub_paths = [path[1:] for path in paths if path[0] in ("*", str(key))]
+        if any(not path for path in sub_paths):
+            projected[key] = _MISSING
+        else:
+            projected[key] = _exclude_paths(value, sub_paths) if sub_paths else value
+    if isinstance(data, Mapping):
+        return {key: value for key, value in projected.items() if value is not _MISSING}
+    return [None if value is _MISSING else value for value in projected.values()]
+
+
+def project_paths(
+    data: Sequence | Mapping,
+    include: Sequence[str | Sequence[str]] = (),
+    exclude: Sequence[str | Sequence[str]] = (),
+):
+    """
+    Prune nested data structures to allow-listed (`include`) and without deny-listed (`exclude`) paths
+    Paths are in the dotted style of `get_path`, `*` matches any key/index
+    Unchanged branches are shared with the original data (not copied)
+
+    Keys that are not included (or are excluded) are removed from mappings
+    Sequences keep their positions (so `get_path` indexes stay valid) - pruned items are replaced with `None`
+    Include paths that do not exist in the data include nothing (not even their parents)
+
+    >>> data = {'a': 1, 'b': 2, 'c': [{'d': 4, 'e': 5}, 6, {'g': 7}], 'e': 5}
+
+    >>> project_paths(data)
+    {'a': 1, 'b': 2, 'c': [{'d': 4, 'e': 5}, 6, {'g': 7}], 'e': 5}
+    >>> project_paths(data, include=('a', 'c.0'))
+    {'a': 1, 'c': [{'d': 4, 'e': 5}, None, None]}
+    >>> project_paths(data, include=('c.*.d',))
+    {'c': [{'d': 4}, None, None]}
+    >>> project_paths(data, include=('a.not_real', 'not_real', 'c.*.not_real'))
+    {}
+    >>> project_paths(data, exclude=('b', 'c.*.e', 'c.1', 'not_real.thing'))
+    {'a': 1, 'c': [{'d': 4}, None, {'g': 7}], 'e': 5}
+    >>> project_paths(data, include=('c',), exclude=('c.*.e',))
+    {'c': [{'d': 4}, 6, {'g': 7}]}
+
+    >>> project_paths({'a': [1, {'y': 2}]}, include=('a.*.y',))
+    {'a': [None, {'y': 2}]}
+    >>> project_paths({'a': {'x': 1}, 'b': {}}, include=('a.y', 'b'))
+    {'b': {}}
+    >>> project_paths([1, {'a': 1, 'b': 2}], exclude=('*.b',))
+    [1, {'a': 1}]
+    >>> project_paths([1, 2], include=('*.a',))
+    []
+    """
+    if include:
+        projected = _include_paths(data, [_split_path(path) for path in include])
+        data = ({} if isinstance(data, Mapping) else []) if projected is _MISSING else projected
+    if exclude:
+        data = _exclude_paths(data, [_split_path(path) for path in exclude])
+    return data
+
+
+def diff(a, b, path: tuple[str, ...] = ()) -> Generator[tuple[str, str], None, None]:
+    """
+    Compare nested data structures - yields (`added`|`removed`|`changed`, dotted path) in the style of `get_path`
+
+    >>> a = {'a': 1, 'b': {'c': 3, 'd': 4}, 'e': [1, 2], 'f': 'same'}
+    >>> b = {'a': 2, 'b': {'c': 3}, 'e': [1, 2, 3], 'f': 'same', 'g': None}
+    >>> tuple(diff(a, b))
+    (('changed', 'a'), ('removed', 'b.d'), ('added', 'e.2'), ('added', 'g'))
+    >>> tuple(diff(a, a))
+    ()
+    >>> tuple(diff([1], {'a': 1}))
+    (('changed', ''),)
+    """
+    if isinstance(a, Mapping) and isinstance(b, Mapping):
+        keys = itertools.chain(a.keys(), (key for key in b.keys() if key not in a))
+        items = ((str(key), key in a, a.get(key), key in b, b.get(key)) for key in keys)
+    elif all(isinstance(i, Sequence) and not isinstance(i, str) for i in (a, b)):
+        items = (
+            (str(index), index < len(a), a[index] if index < len(a) else None, index < len(b), b[index] if index < len(b) else None)
+            for index in range(max(len(a), len(b)))
+        )
+    else:
+        if a != b:
+            yield ("changed", ".".join(path))
+        return
+    for key, in_a, value_a, in_b, value_b in items:
+        if not in_b:
+            yield ("removed", ".".join((*path, key)))
+        elif not in_a:
+            yield ("added", ".".join((*path, key)))
+        else:
+            yield from diff(value_a, value_b, (*path, key))
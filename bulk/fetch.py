@@ -20,7 +20,8 @@ log = logging.getLogger(__name__)
 type JsonPrimitives = str | int | float | bool | None
 type Json = t.Mapping[str, Json | JsonPrimitives] | t.Sequence[Json | JsonPrimitives]
 
-type FetchJsonCallable = t.Callable[[RequestParams], t.Awaitable[Json]]
+class FetchJsonCallable(t.Protocol):
+    def __call__(self, params: "RequestParams", ttl: datetime.timedelta | None = None) -> t.Awaitable[Json]: ...
 
 type ImageUrl = str
 type Base64EncodedImage = str
@@ -90,6 +91,7 @@ class CacheFile():
     params: RequestParams
     cache_path: CachePath
     file_suffix: str = '.raw'
+    ttl: datetime.timedelta | None = None  # override `cache_path.ttl` for this file
 
     @cached_property
     def file(self) -> str:
@@ -103,7 +105,7 @@ class CacheFile():
     def expired(self) -> bool:
         return (
             not self.path.exists() or
-            datetime.datetime.fromtimestamp(self.path.stat().st_mtime) < datetime.datetime.now() - self.cache_path.ttl
+            datetime.datetime.fromtimestamp(self.path.stat().st_mtime) < datetime.datetime.now() - (self.ttl or self.cache_path.ttl)
         )
 
 
@@ -111,11 +113,13 @@ async def fetch_json_cache(
     params: RequestParams,
     cache_path: CachePath,
     session: SessionProtocol,
+    ttl: datetime.timedelta | None = None,
 ) -> Json:
     """
     The cache files can be served by nginx as pre-compressed payloads
+    `ttl` - override `cache_path.ttl` (e.g. to refresh infrequently requested paths less often)
     """
-    cache_file = CacheFile(params, cache_path, file_suffix='.json.gz')
+    cache_file = CacheFile(params, cache_path, file_suffix='.json.gz', ttl=ttl)
 
     if not cache_file.expired:
         log.debug(f'loading from cache {params.url=}')
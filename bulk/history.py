@@ -0,0 +1,173 @@
+import dataclasses
+import datetime
+import functools
+import gzip
+import hashlib
+import logging
+import re
+import typing as t
+from pathlib import Path
+
+import ujson
+
+from .site_model import APIBulk, APIPath
+
+log = logging.getLogger(__name__)
+
+
+type ContentHash = str
+type BulkIndex = t.Mapping[APIPath, tuple[int, int, ContentHash]]  # (offset, length, hash) of the gzip member in the bulk file
+
+DATE_FORMAT = "%Y-%m-%d-%H-%M"
+
+
+def content_hash(data: bytes) -> ContentHash:
+    return hashlib.sha1(data).hexdigest()
+
+
+def index_file(file: Path) -> Path:
+    """
+    >>> index_file(Path('static_json_gzip/bff-car-1970-01-01-00-00.json.gz'))
+    PosixPath('static_json_gzip/bff-car-1970-01-01-00-00.index.json.gz')
+    """
+    return file.with_name(file.name.removesuffix(".json.gz") + ".index.json.gz")
+
+
+def write_bulk(file: Path, api_bulk: APIBulk) -> BulkIndex:
+    """
+    Write the bulk as a single json object, with each path's payload compressed as its own gzip member
+    Concatenated gzip members are still one valid `.json.gz` for nginx and clients
+    The `index_file` records where each payload's member is in the file, so a single payload
+    can be read with `seek` without decompressing or parsing the rest of the bulk
+
+    >>> import tempfile
+    >>> file = Path(tempfile.mkdtemp()).joinpath('test.json.gz')
+    >>> index = write_bulk(file, {'/a': {'a': 1}, '/b': [1, 2]})
+    >>> index_file(file).exists()
+    True
+    >>> with gzip.open(file) as f:
+    ...     ujson.load(f)
+    {'/a': {'a': 1}, '/b': [1, 2]}
+    >>> read_payload(file, index['/b'])
+    b'[1,2]'
+    >>> read_payload(file, index['/a'])
+    b'{"a":1}'
+    """
+    index: dict[APIPath, tuple[int, int, ContentHash]] = {}
+    # Written to temporary files and moved into place (index first) so `History` never reads a partial bulk
+    file_tmp = file.with_name(file.name + ".tmp")
+    file_index_tmp = index_file(file).with_name(index_file(file).name + ".tmp")
+    with file_tmp.open("wb") as f:
+        separator = "{"
+        for api_path, payload in api_bulk.items():
+            f.write(gzip.compress((separator + ujson.dumps(api_path) + ":").encode("UTF-8"), mtime=0))
+            data = ujson.dumps(payload).encode("UTF-8")
+            member = gzip.compress(data, mtime=0)
+            index[api_path] = (f.tell(), len(member), content_hash(data))
+            f.write(member)
+            separator = ","
+        f.write(gzip.compress(("}" if api_bulk else "{}").encode("UTF-8"), mtime=0))
+    with gzip.open(file_index_tmp, "wt", encoding="UTF-8") as zipfile:
+        ujson.dump(index, zipfile)
+    file_index_tmp.replace(index_file(file))
+    file_tmp.replace(file)
+    return index
+
+
+def read_payload(file: Path, index_item: tuple[int, int, ContentHash]) -> bytes:
+    offset, length, _ = index_item
+    with file.open("rb") as f:
+        f.seek(offset)
+        return gzip.decompress(f.read(length))  # only this payload's gzip member
+
+
+@functools.lru_cache(maxsize=64)
+def _load_index(file: Path, mtime: float) -> BulkIndex:
+    with gzip.open(file, "rt", encoding="UTF-8") as zipfile:
+        return ujson.load(zipfile)
+
+
+class HistoryUnavailable(Exception):
+    """The bulk file is incomplete or corrupt"""
+
+
+@dataclasses.dataclass(frozen=True)
+class HistoryItem:
+    timestamp: datetime.datetime
+    hash: ContentHash
+    data: bytes
+
+
+@dataclasses.dataclass(frozen=True)
+class History:
+    """
+    Point-in-time lookup of individual paths from the current and rotated bulk files
+    (`name.json.gz` and `name-%Y-%m-%d-%H-%M.json.gz` with `.index.json.gz` companions)
+
+    >>> import tempfile, os
+    >>> history = History(path=Path(tempfile.mkdtemp()), name='test')
+    >>> with gzip.open(history.path.joinpath('test-2000-01-01-00-00.json.gz'), 'wt') as zipfile:  # legacy bulk without index
+    ...     ujson.dump({'/a': {'a': 0}}, zipfile)
+    >>> _ = write_bulk(history.path.joinpath('test-2000-01-01-12-00.json.gz'), {'/a': {'a': 1}})
+    >>> _ = write_bulk(history.path.joinpath('test-images-2000-01-01-12-00.json.gz'), {})
+    >>> _ = write_bulk(history.path.joinpath('test.json.gz'), {'/a': {'a': 2}})
+    >>> os.utime(history.path.joinpath('test.json.gz'), (datetime.datetime(2000, 1, 2).timestamp(),) * 2)
+
+    >>> [file.name for _, file in history.generations()]
+    ['test-2000-01-01-00-00.json.gz', 'test-2000-01-01-12-00.json.gz', 'test.json.gz']
+    >>> history.get('/a', datetime.datetime(1999, 1, 1))
+    >>> history.get('/a', datetime.datetime(2000, 1, 1, 6, 0)).data
+    b'{"a":0}'
+    >>> history.get('/a', datetime.datetime(2000, 1, 1, 12, 30)).data
+    b'{"a":1}'
+    >>> item = history.get('/a', datetime.datetime(2001, 1, 1))
+    >>> item.timestamp, item.data
+    (datetime.datetime(2000, 1, 2, 0, 0), b'{"a":2}')
+    >>> history.get('/not_real', datetime.datetime(2001, 1, 1))
+
+    >>> _ = history.path.joinpath('test.json.gz').write_bytes(gzip.compress(b'{"/a": {"a"')[:-8])  # partial legacy bulk
+    >>> history.path.joinpath('test.index.json.gz').unlink()
+    >>> try:
+    ...     history.get('/a', datetime.datetime.now())
+    ... except HistoryUnavailable:
+    ...     print('unavailable')
+    unavailable
+    """
+    path: Path
+    name: str
+
+    @functools.cached_property
+    def _regex_generation(self) -> re.Pattern:
+        return re.compile(rf"{re.escape(self.name)}-(?P<date>\d{{4}}-\d{{2}}-\d{{2}}-\d{{2}}-\d{{2}})\.json\.gz")
+
+    def generations(self) -> t.Sequence[tuple[datetime.datetime, Path]]:
+        generations = [
+            (datetime.datetime.strptime(match.group("date"), DATE_FORMAT), file)
+            for file in self.path.glob(f"{self.name}-*.json.gz")
+            if (match := self._regex_generation.fullmatch(file.name))
+        ]
+        if (file := self.path.joinpath(f"{self.name}.json.gz")).exists():
+            generations.append((datetime.datetime.fromtimestamp(file.stat().st_mtime), file))
+        return sorted(generations)
+
+    def generation(self, at: datetime.datetime) -> tuple[datetime.datetime, Path] | None:
+        return next((generation for generation in reversed(self.generations()) if generation[0] <= at), None)
+
+    def get(self, api_path: APIPath, at: datetime.datetime) -> HistoryItem | None:
+        if not (generation := self.generation(at)):
+            return None
+        timestamp, file = generation
+        try:
+            if (file_index := index_file(file)).exists():
+                if not (index_item := _load_index(file_index, file_index.stat().st_mtime).get(api_path)):
+                    return None
+                return HistoryItem(timestamp=timestamp, hash=index_item[2], data=read_payload(file, index_item))
+            # Bulk files written before indexes existed - fallback to parsing the whole file
+            log.warning(f"no index for {file=} - parsing whole bulk")
+            with gzip.open(file, "rt", encoding="UTF-8") as zipfile:
+                if (payload := ujson.load(zipfile).get(api_path)) is None:
+                    return None
+        except (EOFError, OSError, ValueError) as ex:  # `gzip.BadGzipFile` is an `OSError`
+            raise HistoryUnavailable(f"{file=} {ex}") from ex
+        data = ujson.dumps(payload).encode("UTF-8")
+        return HistoryItem(timestamp=timestamp, hash=content_hash(data), data=data)
@@ -0,0 +1,94 @@
+import collections
+import logging
+import re
+import typing as t
+from pathlib import Path
+
+from .fetch import RequestParams
+
+log = logging.getLogger(__name__)
+
+
+type HitKey = str
+
+
+class PathHits(collections.Counter[HitKey]):
+    """
+    Request frequency of individual cached api paths
+    Hits are keyed by the `RequestParams` hash - the same key used to name `CacheFile`s
+    This allows `/fetch` requests and nginx `/static_json_gzip/cache/*` access logs to be counted together
+
+    >>> hits = PathHits()
+    >>> params = RequestParams.build('http://fake/path')
+    >>> hits.add(params)
+    >>> hits.add(params)
+    >>> hits[PathHits.key(params)]
+    2
+    """
+    # only successful requests (200/304) - requests for made up cache files must not grow the counter
+    REGEX_ACCESS_LOG_CACHE_FILE = re.compile(r'"(?:GET|HEAD) /static_json_gzip/cache/(?P<key>-?\d+)\.json[^ "]* [^"]*" (?:200|304) ')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._access_log_offset = 0
+
+    @staticmethod
+    def key(params: RequestParams) -> HitKey:
+        return str(hash(params))
+
+    def add(self, params: RequestParams) -> None:
+        self[self.key(params)] += 1
+
+    def add_access_log_lines(self, lines: t.Iterable[str]) -> None:
+        """
+        >>> hits = PathHits()
+        >>> hits.add_access_log_lines((
+        ...     '1.2.3.4 - - [19/Oct/2026:12:00:00 +0000] "GET /static_json_gzip/cache/-1234.json HTTP/1.1" 200 42 "-" "curl"',
+        ...     '1.2.3.4 - - [19/Oct/2026:12:00:01 +0000] "GET /static_json_gzip/cache/-1234.json?x=1 HTTP/1.1" 200 42 "-" "curl"',
+        ...     '1.2.3.4 - - [19/Oct/2026:12:00:02 +0000] "GET /static_json_gzip/cache/5678.json HTTP/1.1" 304 0 "-" "curl"',
+        ...     '1.2.3.4 - - [19/Oct/2026:12:00:03 +0000] "GET /static_json_gzip/bff-car.json HTTP/1.1" 200 42 "-" "curl"',
+        ...     '1.2.3.4 - - [19/Oct/2026:12:00:04 +0000] "GET /static_json_gzip/cache/999.json HTTP/1.1" 404 0 "-" "curl"',
+        ... ))
+        >>> hits
+        PathHits({'-1234': 2, '5678': 1})
+        """
+        self.update(
+            match.group('key')
+            for line in lines
+            if (match := self.REGEX_ACCESS_LOG_CACHE_FILE.search(line))
+        )
+
+    def read_access_log(self, file: Path) -> None:
+        """
+        Incrementally count new lines in an nginx access log since the last read
+        If the log has been rotated/truncated, it is read from the start
+        The log is streamed line by line (it can be large) - call with `asyncio.to_thread`
+
+        >>> import tempfile
+        >>> file = Path(tempfile.mkdtemp()).joinpath('access.log')
+        >>> _ = file.write_text('"GET /static_json_gzip/cache/1.json HTTP/1.1" 200 42\\n"GET /static_json_gzip/cache/2.json HT')
+        >>> hits = PathHits()
+        >>> hits.read_access_log(file)
+        >>> hits
+        PathHits({'1': 1})
+        >>> with file.open('a') as f:
+        ...     _ = f.write('TP/1.1" 304 0\\n')
+        >>> hits.read_access_log(file)
+        >>> hits
+        PathHits({'1': 1, '2': 1})
+        """
+        if not file.exists():
+            log.warning(f"access log {file=} does not exist")
+            return
+        if file.stat().st_size < self._access_log_offset:
+            self._access_log_offset = 0
+        with file.open('rb') as f:
+            f.seek(self._access_log_offset)
+            self.add_access_log_lines(self._complete_lines(f))
+
+    def _complete_lines(self, f: t.BinaryIO) -> t.Iterator[str]:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # nginx may be mid-way through writing the last line - read it next time
+            self._access_log_offset += len(line)
+            yield line.decode('UTF-8', errors='replace')
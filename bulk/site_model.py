@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import dataclasses
 import datetime
+import heapq
 import logging
 import typing as t
-from itertools import islice
+from itertools import count, islice
 from abc import abstractmethod
+from pathlib import Path
+from types import MappingProxyType
 
+import ujson
+
+from .data import project_paths
 from .fetch import RequestParams
+from .hits import HitKey, PathHits
 
 log = logging.getLogger(__name__)
 
@@ -15,7 +23,46 @@ type APIPath = str
 type APIDepth = int
 type APIPayload = t.Mapping[str, t.Any] | t.Sequence[t.Any]
 type APIBulk = t.Mapping[APIPath, APIPayload]
-type FetchJsonCallable = t.Callable[[RequestParams], t.Awaitable[APIPayload]]
+class FetchJsonCallable(t.Protocol):
+    def __call__(self, params: RequestParams, ttl: datetime.timedelta | None = None) -> t.Awaitable[APIPayload]: ...
+
+
+@dataclasses.dataclass
+class ProjectionReport:
+    """
+    Bytes (uncompressed json) removed from each generation of the bulk by `AbstractSiteModel.project`
+
+    >>> report = ProjectionReport()
+    >>> report.add('/a', {'a': 1, 'tracking': 'xxx'}, {'a': 1})
+    >>> report.add('/b', {'b': 1}, {'b': 1})
+    >>> report.bytes_saved
+    17
+    >>> report.asdict()
+    {'bytes_fetched': 31, 'bytes_projected': 14, 'bytes_saved': 17, 'paths': {'/a': 17}}
+    """
+    bytes_fetched: int = 0
+    bytes_projected: int = 0
+    paths: dict[APIPath, int] = dataclasses.field(default_factory=dict)  # bytes saved per path
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_fetched - self.bytes_projected
+
+    def add(self, path: APIPath, payload: APIPayload, projected: APIPayload) -> None:
+        bytes_fetched = len(ujson.dumps(payload))
+        bytes_projected = len(ujson.dumps(projected)) if projected is not payload else bytes_fetched
+        self.bytes_fetched += bytes_fetched
+        self.bytes_projected += bytes_projected
+        if bytes_saved := bytes_fetched - bytes_projected:
+            self.paths[path] = bytes_saved
+
+    def asdict(self) -> dict[str, t.Any]:
+        return {
+            'bytes_fetched': self.bytes_fetched,
+            'bytes_projected': self.bytes_projected,
+            'bytes_saved': self.bytes_saved,
+            'paths': self.paths,
+        }
 
 
 class AbstractSiteModel:
@@ -25,34 +72,146 @@ class AbstractSiteModel:
     headers: t.Mapping[str, str] = {}
     fetch_json: FetchJsonCallable
     cache_period: datetime.timedelta
+    # Declarative projection of payloads in the dotted style of `get_path` (see `project_paths`)
+    include_paths: t.Sequence[str] = ()
+    exclude_paths: t.Sequence[str] = ()
+    projection_report: ProjectionReport
+    # Request frequency (see `PathHits`) - frequently requested paths are crawled first and lead the bulk
+    hits: t.Mapping[HitKey, int] = MappingProxyType({})
+    # Paths without hits reuse their cached payload for `cache_period * cold_refresh_factor` (fewer upstream requests)
+    cold_refresh_factor: int = 1
+    crawl_limit: int | None = None  # hard cap on paths per crawl (hottest first) - e.g. a lightweight demo
+    checkpoint_interval: int = 20  # paths fetched between writes of the crawl `checkpoint`
 
-    async def crawl(self) -> APIBulk:
-        cache: APIBulk = {}
-        to_crawl: t.Mapping[APIPath, APIDepth] = {self.root_path: 0}
-        while to_crawl:
-            api_path, depth = to_crawl.popitem()
+    async def crawl(self, checkpoint: Path | None = None) -> APIBulk:
+        """
+        `checkpoint` - file to periodically persist the crawl frontier and crawled paths
+        A crawl interrupted by a restart resumes from the checkpoint - crawled paths are refetched via the `fetch_json` cache
+        """
+        cache: dict[APIPath, APIPayload] = {}
+        self.projection_report = ProjectionReport()
+        to_crawl: dict[APIPath, APIDepth] = {self.root_path: 0}
+        if checkpoint and (resumed := self.load_checkpoint(checkpoint)):
+            to_crawl, crawled = resumed
+            log.info(f"resuming crawl from {checkpoint=} to_crawl={len(to_crawl)} fetched={len(crawled)}")
+            for api_path in crawled:
+                cache[api_path] = self.project(api_path, await self.get_api_path(api_path))
+        # `path_hits` hashes `RequestParams` - calculate once per path
+        hits: dict[APIPath, int] = {}
+        def path_hits(path: APIPath) -> int:
+            if path not in hits:
+                hits[path] = self.path_hits(path)
+            return hits[path]
+        # Priority queue of `to_crawl` - most requested first, otherwise last discovered first (like `popitem`)
+        sequence = count()
+        frontier: list[tuple[int, int, APIPath]] = []
+        def push(path: APIPath) -> None:
+            heapq.heappush(frontier, (-path_hits(path), -next(sequence), path))
+        for path in to_crawl:
+            push(path)
+        while frontier:
+            _, _, api_path = heapq.heappop(frontier)
+            if checkpoint and cache and len(cache.keys()) % self.checkpoint_interval == 0:
+                self.save_checkpoint(checkpoint, to_crawl, cache.keys())
+            depth = to_crawl.pop(api_path)
             log.info(
                 f"to_crawl={len(to_crawl)} fetched={len(cache.keys())} {api_path=}"
             )
-            # TODO: put this limiter behind an ENV var to allow people a lightweight demo?
-            #if len(cache.keys()) > 5:  # TEMP! to test!!
-            #    break
+            if self.crawl_limit is not None and len(cache.keys()) >= self.crawl_limit:
+                log.info(f"{self.crawl_limit=} reached - {len(to_crawl)+1} remaining paths not crawled")
+                break
             payload = await self.get_api_path(api_path)
-            cache[api_path] = payload
+            cache[api_path] = self.project(api_path, payload)
             if not self.continue_crawl(api_path, depth, payload):
                 continue
             for path in islice(self.extract_crawl_paths(api_path, payload), 10):
                 # TODO BUG: not quite right, we want to replace if depth is lower
-                to_crawl.setdefault(path, depth + 1)
-            for key in to_crawl.keys() & cache.keys():
-                del to_crawl[key]
-        return cache
+                if path not in to_crawl and path not in cache:
+                    to_crawl[path] = depth + 1
+                    push(path)
+        if self.projection_report.bytes_saved:
+            log.info(f"projection saved {self.projection_report.bytes_saved:,} of {self.projection_report.bytes_fetched:,} bytes")
+        if checkpoint:
+            checkpoint.unlink(missing_ok=True)
+        # Clients can consume the hot paths first (stable sort keeps crawl order for equal hits)
+        return dict(sorted(cache.items(), key=lambda item: path_hits(item[0]), reverse=True))
+
+    def save_checkpoint(self, checkpoint: Path, to_crawl: t.Mapping[APIPath, APIDepth], crawled: t.Iterable[APIPath]) -> None:
+        checkpoint_tmp = checkpoint.with_name(checkpoint.name + '.tmp')
+        checkpoint_tmp.write_text(ujson.dumps({'to_crawl': to_crawl, 'crawled': tuple(crawled)}))
+        checkpoint_tmp.replace(checkpoint)  # atomic - a restart mid-write cannot corrupt the checkpoint
+
+    def load_checkpoint(self, checkpoint: Path) -> tuple[dict[APIPath, APIDepth], list[APIPath]] | None:
+        """
+        >>> import tempfile
+        >>> checkpoint = Path(tempfile.mkdtemp()).joinpath('test.checkpoint.json')
+        >>> site_model = AbstractSiteModel()
+        >>> site_model.cache_period = datetime.timedelta(hours=1)
+        >>> site_model.load_checkpoint(checkpoint)
+        >>> site_model.save_checkpoint(checkpoint, {'/b': 1}, {'/a': None}.keys())
+        >>> site_model.load_checkpoint(checkpoint)
+        ({'/b': 1}, ['/a'])
+        >>> site_model.cache_period = datetime.timedelta(0)
+        >>> site_model.load_checkpoint(checkpoint)
+        """
+        if not checkpoint.exists():
+            return None
+        age = datetime.datetime.now() - datetime.datetime.fromtimestamp(checkpoint.stat().st_mtime)
+        if age > self.cache_period:
+            log.info(f"{checkpoint=} older than {self.cache_period=} - starting crawl from scratch")
+            return None
+        try:
+            data = ujson.loads(checkpoint.read_text())
+            return dict(data['to_crawl']), list(data['crawled'])
+        except (ValueError, KeyError, TypeError) as ex:
+            log.warning(f"{checkpoint=} unreadable - starting crawl from scratch {ex}")
+            return None
+
+    def path_hits(self, path: APIPath) -> int:
+        if not self.hits:
+            return 0
+        return self.hits.get(PathHits.key(self.request_params(path)), 0)
+
+    def refresh_period(self, path: APIPath) -> datetime.timedelta:
+        """
+        How old a cached payload for this path can be before it is fetched from upstream again
+        Until any hits are recorded, every path is treated as hot
+
+        >>> site_model = AbstractSiteModel()
+        >>> site_model.endpoint = 'http://fake'
+        >>> site_model.cache_period = datetime.timedelta(hours=1)
+        >>> site_model.cold_refresh_factor = 4
+        >>> site_model.refresh_period('/cold')
+        datetime.timedelta(seconds=3600)
+        >>> site_model.hits = PathHits({PathHits.key(site_model.request_params('/hot')): 1})
+        >>> site_model.refresh_period('/hot')
+        datetime.timedelta(seconds=3600)
+        >>> site_model.refresh_period('/cold')
+        datetime.timedelta(seconds=14400)
+        """
+        if not self.hits or self.path_hits(path) or path == self.root_path:
+            return self.cache_period
+        return self.cache_period * self.cold_refresh_factor
+
+    def project(self, path: APIPath, payload: APIPayload) -> APIPayload:
+        """
+        Prune fields clients never read before the payload is added to the bulk
+        The unprojected payload is still used for `continue_crawl` and `extract_crawl_paths`
+        """
+        if not (self.include_paths or self.exclude_paths):
+            return payload
+        projected = project_paths(payload, include=self.include_paths, exclude=self.exclude_paths)
+        self.projection_report.add(path, payload, projected)
+        return projected
 
     async def get_api_path(self, path: APIPath) -> APIPayload:
         """
         Perform the actual fetch of data
         """
-        return await self.fetch_json(RequestParams.build(url=self.endpoint+path, headers=self.headers))
+        return await self.fetch_json(self.request_params(path), ttl=self.refresh_period(path))
+
+    def request_params(self, path: APIPath) -> RequestParams:
+        return RequestParams.build(url=self.endpoint+path, headers=self.headers)
 
     @abstractmethod
     def continue_crawl(
@@ -28,6 +28,9 @@ app.static('/static/', Path('static/'))
 app.config.PATH_STATIC = Path("./static_json_gzip/")
 if not app.config.PATH_STATIC.is_dir():
     raise Exception(f"{app.config.PATH_STATIC=} must exist")
+# Internal state (crawl checkpoints) - not published by nginx
+app.config.PATH_STATE = Path("./state/")
+app.config.PATH_STATE.mkdir(exist_ok=True)
 from .static_gzip import static_json_gzip
 app.add_route(static_json_gzip, "/static_json_gzip/<path:path>")
 # curl --compressed --url http://localhost:8000/static_json_gzip/bff-car.json (should be encoded gzip)
@@ -35,7 +38,9 @@ app.add_route(static_json_gzip, "/static_json_gzip/<path:path>")
 
 
 from bulk.fetch import RequestParams, CachePath, CacheFile
+from bulk.hits import PathHits
 cache_path_data = CachePath(path=app.config.PATH_STATIC.joinpath('cache'))
+path_hits = PathHits()  # request frequency used to prioritise the crawl
 @app.route("/fetch")
 async def redirect_to_cache_file(request: sanic.Request) -> sanic.HTTPResponse:
     params: dict[str, str] = {**dict(request.query_args), **request.form, **(request.json or {})}
@@ -48,6 +53,10 @@ async def redirect_to_cache_file(request: sanic.Request) -> sanic.HTTPResponse:
         cache_path=cache_path_data,
         file_suffix='.json.gz',
     )
+    # with nginx, the redirected request is counted from the access log - only count one source
+    # only count crawled/cached urls - arbitrary urls must not grow the counter
+    if not app.config.get('PATH_NGINX_ACCESS_LOG') and cache_file.path.exists():
+        path_hits.add(cache_file.params)
     path = str(cache_file.path.relative_to(app.config.PATH_STATIC)).removesuffix('.gz')
     return sanic.response.convenience.redirect(to=app.url_for('static_json_gzip', path=path))
 
@@ -59,6 +68,14 @@ from sites.bff_car import BffCarImageModel, BffCarSiteModel
 # Future: Dynamically import .sites handlers using `importlib`
 # For now - we can import directly
 
+from bulk.history import History
+app.ctx.history = History(path=app.config.PATH_STATIC, name=BffCarSiteModel.name)
+from .history import history, history_diff
+app.add_route(history, "/history")
+app.add_route(history_diff, "/history/diff")
+# curl "http://localhost:8000/history?path=/features&at=2024-01-01T12:00"
+# curl "http://localhost:8000/history/diff?path=/features&from=2024-01-01T12:00"
+
 #@app.main_process_start
 @app.before_server_start
 async def setup_background_tasks(app: sanic.Sanic):
@@ -75,8 +92,11 @@ async def setup_background_tasks(app: sanic.Sanic):
     )
     app.add_task(
         create_background_bulk_crawler_task(
-            site_model=BffCarSiteModel(fetch_json),
+            site_model=BffCarSiteModel(fetch_json, hits=path_hits),
             image_model=BffCarImageModel(fetch_image_preview),
             path=app.config.PATH_STATIC,
+            path_hits=path_hits,
+            path_state=app.config.PATH_STATE,
+            path_access_log=Path(app.config.PATH_NGINX_ACCESS_LOG) if app.config.get('PATH_NGINX_ACCESS_LOG') else None,
         )
     )
\ No newline at end of file
@@ -0,0 +1,84 @@
+import asyncio
+import datetime
+from email.utils import format_datetime
+
+import sanic
+import ujson
+
+from bulk.data import diff
+from bulk.history import History, HistoryItem, HistoryUnavailable
+
+
+def _parse_datetime(value: str | None) -> datetime.datetime:
+    if not value:
+        return datetime.datetime.now()
+    try:
+        at = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise sanic.exceptions.BadRequest(f"{value=} is not an iso datetime e.g. 2024-01-01T12:00")
+    # bulk file timestamps are local naive datetimes
+    return at.astimezone().replace(tzinfo=None) if at.tzinfo else at
+
+
+async def _get(request: sanic.Request, at: str | None) -> HistoryItem | None:
+    api_path = request.args.get("path")
+    if not api_path:
+        raise sanic.exceptions.BadRequest("path missing")
+    history: History = request.app.ctx.history
+    try:
+        # decompressing the bulk is slow - keep it off the event loop
+        item = await asyncio.to_thread(history.get, api_path, _parse_datetime(at))
+    except HistoryUnavailable:
+        raise sanic.exceptions.ServiceUnavailable(f"history at {at=} is unavailable (bulk being written or corrupt)")
+    return item
+
+
+async def history(request: sanic.Request) -> sanic.HTTPResponse:
+    """
+    A single path from the bulk generation that was current `at` the given time
+    /history?path=/features&at=2024-01-01T12:00
+    """
+    item = await _get(request, request.args.get("at"))
+    if not item:
+        raise sanic.exceptions.NotFound(f"path={request.args.get('path')} not in history at at={request.args.get('at')}")
+    return sanic.response.raw(
+        item.data,
+        content_type="application/json",
+        headers={
+            "ETag": f'"{item.hash}"',
+            "Last-Modified": format_datetime(item.timestamp.astimezone(datetime.timezone.utc), usegmt=True),
+            "Access-Control-Allow-Origin": "*",
+        },
+    )
+
+
+async def history_diff(request: sanic.Request) -> sanic.HTTPResponse:
+    """
+    Compare a single path between two points in time (`to` defaults to now)
+    A side without the path (added/removed between the two times) is `null`
+    /history/diff?path=/features&from=2024-01-01T12:00&to=2024-01-02T12:00
+    """
+    if not request.args.get("from"):
+        raise sanic.exceptions.BadRequest("from missing")
+    item_from = await _get(request, request.args.get("from"))
+    item_to = await _get(request, request.args.get("to"))
+    if not item_from and not item_to:
+        raise sanic.exceptions.NotFound(f"path={request.args.get('path')} not in history at either time")
+    changes: dict[str, list[str]] = {"added": [], "removed": [], "changed": []}
+    if not item_from:
+        changes["added"].append("")
+    elif not item_to:
+        changes["removed"].append("")
+    elif item_from.hash != item_to.hash:
+        for change, path in diff(ujson.loads(item_from.data), ujson.loads(item_to.data)):
+            changes[change].append(path)
+    return sanic.response.json(
+        {
+            "path": request.args.get("path"),
+            "from": {"timestamp": item_from.timestamp.isoformat(), "hash": item_from.hash} if item_from else None,
+            "to": {"timestamp": item_to.timestamp.isoformat(), "hash": item_to.hash} if item_to else None,
+            "identical": bool(item_from and item_to and item_from.hash == item_to.hash),
+            **changes,
+        },
+        headers={"Access-Control-Allow-Origin": "*"},
+    )
@@ -1,8 +1,10 @@
 import datetime
 import re
 import typing as t
+from types import MappingProxyType
 
 from bulk.data import crawl_for_key, get_path
+from bulk.hits import HitKey
 from bulk.site_model import AbstractSiteModel, APIBulk, APIDepth, APIPath, APIPayload, FetchJsonCallable
 from bulk.image_model import AbstractImageModel, ImageUrl, FetchImageBase64Callable
 
@@ -10,10 +12,14 @@ from bulk.image_model import AbstractImageModel, ImageUrl, FetchImageBase64Calla
 class BffCarSiteModel(AbstractSiteModel):
     name = 'bff-car'
     cache_period = datetime.timedelta(hours=1, minutes=1)
+    cold_refresh_factor = 4  # paths nobody requested are refetched roughly every 4 hours
+    # TODO: `include_paths`/`exclude_paths` - not declared yet, the bulk is published unprojected
+    # The analytics/tracking/layout fields clients never read need confirming with the client teams first
 
-    def __init__(self, fetch_json: FetchJsonCallable, endpoint: str = 'https://bff-car-guacamole.musicradio.com'):
+    def __init__(self, fetch_json: FetchJsonCallable, endpoint: str = 'https://bff-car-guacamole.musicradio.com', hits: t.Mapping[HitKey, int] = MappingProxyType({})):
         self.fetch_json = fetch_json
         self.endpoint = endpoint
+        self.hits = hits
         self.headers = {"Accept": "application/vnd.global.6+json"}
         self.root_path: APIPath = '/features'
 
@@ -0,0 +1,131 @@
+import datetime
+import typing as t
+from pathlib import Path
+
+import pytest
+
+from bulk.fetch import RequestParams
+from bulk.hits import PathHits
+from bulk.site_model import AbstractSiteModel, APIDepth, APIPath, APIPayload
+
+
+SITE = {
+    '/': ['/a', '/b', '/c'],
+    '/a': ['/a/1', '/a/2'],
+    '/b': [],
+    '/c': ['/c/1'],
+    '/a/1': [],
+    '/a/2': [],
+    '/c/1': [],
+}
+
+
+class FakeSiteModel(AbstractSiteModel):
+    name = 'fake'
+    endpoint = 'http://fake'
+    cache_period = datetime.timedelta(hours=1)
+
+    def __init__(self, site: t.Mapping[APIPath, t.Sequence[APIPath]] = SITE, fail_after: int | None = None):
+        self.site = site
+        self.fail_after = fail_after
+        self.fetched: list[tuple[APIPath, datetime.timedelta | None]] = []
+        self.fetch_json = self._fetch_json
+
+    async def _fetch_json(self, params: RequestParams, ttl: datetime.timedelta | None = None) -> APIPayload:
+        path = params.url.removeprefix(self.endpoint)
+        if self.fail_after is not None and len(self.fetched) >= self.fail_after:
+            raise Exception('simulated restart')
+        self.fetched.append((path, ttl))
+        return {'links': self.site[path], 'tracking': 'xxx'}
+
+    def continue_crawl(self, path: APIPath, depth: APIDepth, payload: APIPayload) -> bool:
+        return True
+
+    def extract_crawl_paths(self, path: APIPath, payload: APIPayload) -> t.Iterable[APIPath]:
+        return payload['links']  # type: ignore[call-overload]
+
+
+def hits(site_model: AbstractSiteModel, **path_hits: int) -> PathHits:
+    return PathHits({PathHits.key(site_model.request_params(path)): count for path, count in path_hits.items()})
+
+
+@pytest.fixture
+def site_model() -> FakeSiteModel:
+    return FakeSiteModel()
+
+
+async def test_crawl(site_model: FakeSiteModel) -> None:
+    bulk = await site_model.crawl()
+    assert bulk.keys() == SITE.keys()
+    assert bulk['/'] == {'links': ['/a', '/b', '/c'], 'tracking': 'xxx'}
+
+
+async def test_crawl_hits_ordering(site_model: FakeSiteModel) -> None:
+    site_model.hits = hits(site_model, **{'/b': 2, '/c/1': 5})
+    bulk = await site_model.crawl()
+    fetched = [path for path, _ in site_model.fetched]
+    assert fetched.index('/b') < fetched.index('/a')
+    assert fetched.index('/c/1') == fetched.index('/c') + 1, 'discovered hot path is crawled next'
+    assert tuple(bulk.keys())[:2] == ('/c/1', '/b'), 'most requested paths lead the bulk'
+    assert bulk.keys() == SITE.keys()
+
+
+async def test_crawl_limit(site_model: FakeSiteModel) -> None:
+    site_model.hits = hits(site_model, **{'/c': 1})
+    site_model.crawl_limit = 3
+    bulk = await site_model.crawl()
+    assert tuple(bulk.keys()) == ('/c', '/', '/c/1')
+    assert len(site_model.fetched) == 3
+
+
+async def test_crawl_cold_refresh_period(site_model: FakeSiteModel) -> None:
+    site_model.hits = hits(site_model, **{'/b': 1})
+    site_model.cold_refresh_factor = 4
+    await site_model.crawl()
+    ttls = dict(site_model.fetched)
+    assert ttls['/'] == ttls['/b'] == datetime.timedelta(hours=1)
+    assert ttls['/a'] == ttls['/c/1'] == datetime.timedelta(hours=4)
+
+
+async def test_crawl_projection(site_model: FakeSiteModel) -> None:
+    site_model.exclude_paths = ('tracking',)
+    bulk = await site_model.crawl()
+    assert bulk.keys() == SITE.keys(), 'crawl uses the unprojected payload'
+    assert bulk['/'] == {'links': ['/a', '/b', '/c']}
+    assert site_model.projection_report.bytes_saved == len(',"tracking":"xxx"') * len(SITE)
+
+
+async def test_crawl_checkpoint_resume(tmp_path: Path, site_model: FakeSiteModel) -> None:
+    checkpoint = tmp_path.joinpath('fake.checkpoint.json')
+    # A frontier a fresh crawl could never reach first (a fresh crawl goes `/` -> `/c`)
+    site_model.save_checkpoint(checkpoint, {'/c/1': 2}, ('/', '/a'))
+    bulk = await site_model.crawl(checkpoint=checkpoint)
+    assert [path for path, _ in site_model.fetched] == ['/', '/a', '/c/1'], 'crawled paths (cache) refetched, then the saved frontier'
+    assert '/c' not in bulk, 'crawled paths are not re-expanded - the checkpoint frontier is the whole remaining crawl'
+    assert bulk.keys() == {'/', '/a', '/c/1'}
+    assert not checkpoint.exists(), 'checkpoint removed once the crawl completes'
+
+
+async def test_crawl_checkpoint_interrupted(tmp_path: Path) -> None:
+    checkpoint = tmp_path.joinpath('fake.checkpoint.json')
+    site_model = FakeSiteModel(fail_after=5)
+    site_model.checkpoint_interval = 2
+    with pytest.raises(Exception, match='simulated restart'):
+        await site_model.crawl(checkpoint=checkpoint)
+    to_crawl, crawled = site_model.load_checkpoint(checkpoint) or ({}, [])
+    assert crawled == [path for path, _ in site_model.fetched[:4]]
+    assert to_crawl and not to_crawl.keys() & set(crawled)
+
+    site_model = FakeSiteModel()  # new process
+    bulk = await site_model.crawl(checkpoint=checkpoint)
+    assert bulk.keys() == SITE.keys()
+    assert [path for path, _ in site_model.fetched][:4] == crawled
+
+
+async def test_crawl_checkpoint_stale(tmp_path: Path, site_model: FakeSiteModel) -> None:
+    checkpoint = tmp_path.joinpath('fake.checkpoint.json')
+    site_model.save_checkpoint(checkpoint, {'/b': 1}, ('/',))
+    site_model.cache_period = datetime.timedelta(0)
+    bulk = await site_model.crawl(checkpoint=checkpoint)
+    assert bulk.keys() == SITE.keys()
+    assert site_model.fetched[0][0] == '/', 'stale checkpoint ignored - crawl from root'